@@ -1,14 +1,24 @@
-from fastapi import FastAPI, APIRouter
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
 import os
+import asyncio
+import hashlib
+import hmac
+import orjson
+import msgspec
+import numpy as np
 import logging
+import time
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 
 
 ROOT_DIR = Path(__file__).parent
@@ -16,11 +26,90 @@ load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# One client (and connection pool) per worker process
+client = AsyncIOMotorClient(
+    mongo_url,
+    maxPoolSize=50,
+    minPoolSize=10,
+    maxConnecting=4,
+    serverSelectionTimeoutMS=3000,
+    connectTimeoutMS=2000,
+    tz_aware=True,
+)
 db = client[os.environ['DB_NAME']]
 
+# In-process TTL cache for the dashboard stats
+DASHBOARD_CACHE_TTL = 60  # seconds
+_dashboard_cache = {"value": None, "expires": 0.0, "generation": 0}
+_dashboard_lock = asyncio.Lock()
+
+def invalidate_dashboard_cache():
+    _dashboard_cache["expires"] = 0.0
+    _dashboard_cache["generation"] += 1
+
+# Projections: never ship Mongo's internal _id, which the models don't use
+ITEM_PROJECTION = {"_id": 0}
+MOVEMENT_PROJECTION = {"_id": 0}
+
+# Server error code for unique index violations
+DUPLICATE_KEY_ERROR = 11000
+
+# Recomputes the denormalized low_stock flag; append to any pipeline update touching quantity/min_stock
+LOW_STOCK_STAGE = {"$set": {"low_stock": {"$lte": ["$quantity", {"$ifNull": ["$min_stock", 10]}]}}}
+
+# Bumps the per-item version that backs the ETag; append to every pipeline update on an item
+VERSION_STAGE = {"$set": {"version": {"$add": [{"$ifNull": ["$version", 0]}, 1]}}}
+
+class BatchLoader:
+    """Coalesce point lookups issued within one event-loop tick into a single $in query."""
+
+    def __init__(self, collection, projection):
+        self.collection = collection
+        self.projection = projection
+        self._pending = []
+        self._tasks = set()
+
+    async def load(self, key):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._dispatch)
+        self._pending.append((key, future))
+        return await future
+
+    def _dispatch(self):
+        batch, self._pending = self._pending, []
+        task = asyncio.ensure_future(self._flush(batch))
+        # Keep a reference so the task isn't garbage-collected mid-flight
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, batch):
+        keys = list({key for key, _ in batch})
+        try:
+            docs = await self.collection.find({"id": {"$in": keys}}, self.projection).to_list(len(keys))
+            docs_by_key = {doc["id"]: doc for doc in docs}
+            for key, future in batch:
+                if not future.done():
+                    future.set_result(docs_by_key.get(key))
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+        finally:
+            # Cancellation (e.g. on shutdown) skips both branches above; never leave a waiter hanging
+            for _, future in batch:
+                if not future.done():
+                    future.cancel()
+
+item_loader = BatchLoader(db.inventory_items, ITEM_PROJECTION)
+
+def utcnow() -> datetime:
+    # Timezone-aware replacement for the deprecated datetime.utcnow()
+    return datetime.now(timezone.utc)
+
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -35,8 +124,8 @@ class InventoryItem(BaseModel):
     location: str
     category: str = "General"
     min_stock: int = 10
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
 class InventoryItemCreate(BaseModel):
     name: str
@@ -64,7 +153,7 @@ class StockMovement(BaseModel):
     quantity: int
     reason: str
     user: str = "Sistema"
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utcnow)
 
 class StockMovementCreate(BaseModel):
     item_id: str
@@ -74,136 +163,483 @@ class StockMovementCreate(BaseModel):
     reason: str
     user: str = "Sistema"
 
+# msgspec mirrors of the response models, used to encode the hot list endpoints
+class InventoryItemRecord(msgspec.Struct, kw_only=True):
+    id: str
+    name: str
+    code: str
+    quantity: int
+    price: float
+    location: str
+    category: str = "General"
+    min_stock: int = 10
+    created_at: datetime
+    updated_at: datetime
+
+class StockMovementRecord(msgspec.Struct, kw_only=True):
+    id: str
+    item_id: str
+    item_name: str
+    movement_type: str
+    quantity: int
+    reason: str
+    user: str = "Sistema"
+    timestamp: datetime
+
+json_encoder = msgspec.json.Encoder()
+
+def encode_records(docs: list, record_type) -> Response:
+    # Extra document fields (e.g. low_stock) are dropped by the conversion
+    records = msgspec.convert(docs, List[record_type])
+    return Response(content=json_encoder.encode(records), media_type="application/json")
+
 class User(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     username: str
     email: str
     password_hash: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
 
 class UserCreate(BaseModel):
     username: str
     email: str
     password: str
 
+class ErrorModel(BaseModel):
+    detail: str
+
+class BulkItemRejection(BaseModel):
+    index: int
+    code: str
+    detail: str
+
+class BulkItemsResult(BaseModel):
+    inserted: List[InventoryItem]
+    rejected: List[BulkItemRejection]
+
 # Basic routes
+ROOT_RESPONSE_BODY = orjson.dumps({"message": "Sistema de Controle de Estoque API"})
+
 @api_router.get("/")
 async def root():
-    return {"message": "Sistema de Controle de Estoque API"}
+    # Constant payload, serialized once at import time
+    return Response(
+        content=ROOT_RESPONSE_BODY,
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=60"},
+    )
+
+def is_uuid(value: str) -> bool:
+    # Cheap shape check for our uuid4 ids, so malformed ids never reach Mongo
+    return len(value) == 36 and value[8] == "-" and value[13] == "-" and value[18] == "-" and value[23] == "-"
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison: the W/ prefix is ignored on both sides
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    tags = [opaque(tag) for tag in if_none_match.split(",")]
+    return "*" in tags or opaque(etag) in tags
+
+def item_document(item_obj: InventoryItem) -> dict:
+    item_doc = item_obj.dict()
+    item_doc["low_stock"] = item_obj.quantity <= item_obj.min_stock
+    item_doc["version"] = 1
+    return item_doc
+
+def movement_update(movement: StockMovementCreate, now: datetime) -> list:
+    # Pipeline update so the new quantity is computed atomically on the server
+    if movement.movement_type == "entrada":
+        new_quantity = {"$add": ["$quantity", movement.quantity]}
+    elif movement.movement_type == "saida":
+        new_quantity = {"$max": [0, {"$subtract": ["$quantity", movement.quantity]}]}
+    else:  # ajuste
+        new_quantity = {"$literal": movement.quantity}
+    return [{"$set": {"quantity": new_quantity, "updated_at": now}}, LOW_STOCK_STAGE, VERSION_STAGE]
 
 # Inventory routes
 @api_router.post("/items", response_model=InventoryItem)
 async def create_item(item: InventoryItemCreate):
     item_dict = item.dict()
     item_obj = InventoryItem(**item_dict)
-    await db.inventory_items.insert_one(item_obj.dict())
+    try:
+        await db.inventory_items.insert_one(item_document(item_obj))
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Item code already exists")
+    invalidate_dashboard_cache()
     return item_obj
 
-@api_router.get("/items", response_model=List[InventoryItem])
-async def get_items():
-    items = await db.inventory_items.find().to_list(1000)
-    return [InventoryItem(**item) for item in items]
+@api_router.post("/items/bulk", response_model=BulkItemsResult)
+async def create_items_bulk(items: List[InventoryItemCreate]):
+    item_objs = [InventoryItem(**item.dict()) for item in items]
+    if not item_objs:
+        return BulkItemsResult(inserted=[], rejected=[])
 
-@api_router.get("/items/{item_id}", response_model=InventoryItem)
-async def get_item(item_id: str):
-    item = await db.inventory_items.find_one({"id": item_id})
-    if item:
-        return InventoryItem(**item)
-    return {"error": "Item not found"}
+    # Unordered so one duplicate code doesn't abort the rest of the batch
+    rejected = []
+    try:
+        await db.inventory_items.insert_many([item_document(obj) for obj in item_objs], ordered=False)
+    except BulkWriteError as exc:
+        write_errors = exc.details["writeErrors"]
+        # Only duplicate keys are an expected, per-item outcome; anything else is a real failure
+        if any(error["code"] != DUPLICATE_KEY_ERROR for error in write_errors):
+            raise
+        rejected = [
+            BulkItemRejection(index=error["index"], code=item_objs[error["index"]].code, detail="Item code already exists")
+            for error in write_errors
+        ]
+    finally:
+        # Some documents may have been stored even when the batch raised
+        invalidate_dashboard_cache()
+    rejected_indexes = {rejection.index for rejection in rejected}
+    return BulkItemsResult(
+        inserted=[obj for i, obj in enumerate(item_objs) if i not in rejected_indexes],
+        rejected=rejected,
+    )
 
-@api_router.put("/items/{item_id}", response_model=InventoryItem)
+@api_router.get("/items")
+async def get_items(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    # Bypass Pydantic and FastAPI's response-model pass; msgspec converts and encodes in C
+    # Newest first, with id as a tie-breaker so offset pages are stable
+    cursor = (
+        db.inventory_items.find({}, ITEM_PROJECTION)
+        .sort([("created_at", -1), ("id", 1)])
+        .skip(offset)
+        .limit(limit)
+    )
+    return encode_records(await cursor.to_list(limit), InventoryItemRecord)
+
+@api_router.get("/items/{item_id}", response_model=InventoryItem, responses={404: {"model": ErrorModel}})
+async def get_item(item_id: str, request: Request, response: Response):
+    if not is_uuid(item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
+    item = await item_loader.load(item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    # Unchanged items short-circuit before model construction and serialization.
+    # updated_at only has millisecond precision in Mongo, so the ETag uses the write counter.
+    etag = f'W/"{item.get("version", 0)}"'
+    if etag_matches(request.headers.get("if-none-match", ""), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return InventoryItem.model_construct(**item)
+
+@api_router.put("/items/{item_id}", response_model=InventoryItem, responses={404: {"model": ErrorModel}})
 async def update_item(item_id: str, item_update: InventoryItemUpdate):
+    if not is_uuid(item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
     update_data = {k: v for k, v in item_update.dict(exclude_unset=True).items() if v is not None}
-    update_data["updated_at"] = datetime.utcnow()
+    update_data["updated_at"] = utcnow()
     
-    await db.inventory_items.update_one({"id": item_id}, {"$set": update_data})
-    updated_item = await db.inventory_items.find_one({"id": item_id})
+    try:
+        # Pipeline update so low_stock is recomputed from the new values; $literal keeps
+        # user-supplied strings starting with "$" from being read as field paths
+        result = await db.inventory_items.update_one(
+            {"id": item_id},
+            [{"$set": {k: {"$literal": v} for k, v in update_data.items()}}, LOW_STOCK_STAGE, VERSION_STAGE],
+        )
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Item code already exists")
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_dashboard_cache()
+    updated_item = await item_loader.load(item_id)
     
-    if updated_item:
-        return InventoryItem(**updated_item)
-    return {"error": "Item not found"}
+    if not updated_item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return InventoryItem.model_construct(**updated_item)
 
-@api_router.delete("/items/{item_id}")
+@api_router.delete("/items/{item_id}", responses={404: {"model": ErrorModel}})
 async def delete_item(item_id: str):
+    if not is_uuid(item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
     result = await db.inventory_items.delete_one({"id": item_id})
-    if result.deleted_count == 1:
-        return {"message": "Item deleted successfully"}
-    return {"error": "Item not found"}
+    if result.deleted_count != 1:
+        raise HTTPException(status_code=404, detail="Item not found")
+    invalidate_dashboard_cache()
+    return {"message": "Item deleted successfully"}
 
 # Stock movement routes
-@api_router.post("/movements", response_model=StockMovement)
+@api_router.post("/movements", response_model=StockMovement, responses={404: {"model": ErrorModel}})
 async def create_movement(movement: StockMovementCreate):
+    if not is_uuid(movement.item_id):
+        raise HTTPException(status_code=404, detail="Item not found")
     movement_dict = movement.dict()
     movement_obj = StockMovement(**movement_dict)
-    await db.stock_movements.insert_one(movement_obj.dict())
-    
-    # Update item quantity based on movement
-    item = await db.inventory_items.find_one({"id": movement.item_id})
-    if item:
-        current_qty = item["quantity"]
-        if movement.movement_type == "entrada":
-            new_qty = current_qty + movement.quantity
-        elif movement.movement_type == "saida":
-            new_qty = max(0, current_qty - movement.quantity)
-        else:  # ajuste
-            new_qty = movement.quantity
-        
-        await db.inventory_items.update_one(
-            {"id": movement.item_id}, 
-            {"$set": {"quantity": new_qty, "updated_at": datetime.utcnow()}}
-        )
     
+    # Update item quantity atomically on the server (no read-modify-write)
+    now = utcnow()
+    update = movement_update(movement, now)
+
+    # The movement record and the stock update are independent, so run them concurrently
+    insert_result, previous = await asyncio.gather(
+        db.stock_movements.insert_one(movement_obj.dict()),
+        db.inventory_items.find_one_and_update(
+            {"id": movement.item_id},
+            update,
+            projection={"_id": 0, "quantity": 1, "updated_at": 1},
+            return_document=ReturnDocument.BEFORE,
+        ),
+        return_exceptions=True,
+    )
+    insert_failed = isinstance(insert_result, BaseException)
+    update_failed = isinstance(previous, BaseException)
+    update_applied = not update_failed and previous is not None
+
+    try:
+        # Compensate if only one side went through, so stock and history stay in step
+        if not update_applied and not insert_failed:
+            await db.stock_movements.delete_one({"id": movement_obj.id})
+        if insert_failed and update_applied:
+            # Only roll back if no other write has touched the item since ours
+            await db.inventory_items.update_one(
+                {"id": movement.item_id, "updated_at": now},
+                [{"$set": {"quantity": {"$literal": previous["quantity"]}, "updated_at": previous["updated_at"]}},
+                 LOW_STOCK_STAGE, VERSION_STAGE],
+            )
+
+        if insert_failed:
+            raise insert_result
+        if update_failed:
+            raise previous
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+    finally:
+        # Stock changed at least transiently; drop any stats cached in the meantime
+        if update_applied:
+            invalidate_dashboard_cache()
+
     return movement_obj
 
-@api_router.get("/movements", response_model=List[StockMovement])
-async def get_movements():
-    movements = await db.stock_movements.find().sort("timestamp", -1).to_list(1000)
-    return [StockMovement(**movement) for movement in movements]
+@api_router.post("/movements/bulk", response_model=List[StockMovement], responses={404: {"model": ErrorModel}})
+async def create_movements_bulk(movements: List[StockMovementCreate]):
+    movement_objs = [StockMovement(**movement.dict()) for movement in movements]
+    if not movement_objs:
+        return []
+
+    # Reject the whole batch up front rather than recording movements for missing items
+    item_ids = {movement.item_id for movement in movements}
+    existing = await db.inventory_items.find(
+        {"id": {"$in": [item_id for item_id in item_ids if is_uuid(item_id)]}}, {"_id": 0, "id": 1}
+    ).to_list(None)
+    missing = item_ids - {item["id"] for item in existing}
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Item not found: {', '.join(sorted(missing))}")
+
+    # Ordered so several movements on the same item are applied in sequence
+    now = utcnow()
+    updates = [
+        UpdateOne({"id": movement.item_id}, movement_update(movement, now))
+        for movement in movements
+    ]
+    insert_error, update_error = await asyncio.gather(
+        db.stock_movements.insert_many([obj.dict() for obj in movement_objs]),
+        db.inventory_items.bulk_write(updates, ordered=True),
+        return_exceptions=True,
+    )
+    if not isinstance(insert_error, BaseException):
+        insert_error = None
+    if not isinstance(update_error, BaseException):
+        update_error = None
+
+    try:
+        # An ordered bulk_write stops at its first error, so everything before it was applied
+        applied = len(movement_objs)
+        if update_error is not None:
+            write_errors = update_error.details["writeErrors"] if isinstance(update_error, BulkWriteError) else []
+            applied = write_errors[0]["index"] if write_errors else 0
+
+        # Drop history for movements whose stock update never ran
+        unapplied_ids = [obj.id for obj in movement_objs[applied:]]
+        if unapplied_ids:
+            await db.stock_movements.delete_many({"id": {"$in": unapplied_ids}})
+
+        # Stock was updated for these, so their history must exist; re-insert what's missing
+        if insert_error is not None and applied:
+            applied_objs = movement_objs[:applied]
+            stored = await db.stock_movements.find(
+                {"id": {"$in": [obj.id for obj in applied_objs]}}, {"_id": 0, "id": 1}
+            ).to_list(None)
+            stored_ids = {movement["id"] for movement in stored}
+            missing = [obj for obj in applied_objs if obj.id not in stored_ids]
+            if missing:
+                try:
+                    await db.stock_movements.insert_many([obj.dict() for obj in missing], ordered=False)
+                except Exception:
+                    logger.error(
+                        "Stock updated without movement records for movements: %s",
+                        [obj.id for obj in missing],
+                    )
+                    raise
+
+        # A failed insert is fully recovered above once every update was applied
+        if update_error is not None:
+            raise update_error
+    finally:
+        # Part of the batch may have changed stock even when we raise
+        invalidate_dashboard_cache()
+    return movement_objs
+
+@api_router.get("/movements")
+async def get_movements(limit: int = Query(100, ge=1, le=1000), offset: int = Query(0, ge=0)):
+    cursor = (
+        db.stock_movements.find({}, MOVEMENT_PROJECTION)
+        .sort([("timestamp", -1), ("id", 1)])
+        .skip(offset)
+        .limit(limit)
+    )
+    return encode_records(await cursor.to_list(limit), StockMovementRecord)
 
 # Dashboard stats route
 @api_router.get("/dashboard/stats")
 async def get_dashboard_stats():
-    # Get all items
-    items = await db.inventory_items.find().to_list(1000)
-    
-    total_items = len(items)
-    total_quantity = sum(item["quantity"] for item in items)
-    total_value = sum(item["quantity"] * item["price"] for item in items)
-    low_stock_items = len([item for item in items if item["quantity"] <= item.get("min_stock", 10)])
-    categories = len(set(item.get("category", "General") for item in items))
-    
+    if _dashboard_cache["expires"] > time.monotonic():
+        return _dashboard_cache["value"]
+
+    async with _dashboard_lock:
+        # Another request may have refreshed the cache while we waited
+        if _dashboard_cache["expires"] > time.monotonic():
+            return _dashboard_cache["value"]
+        generation = _dashboard_cache["generation"]
+        stats = await compute_dashboard_stats()
+        # Don't cache a result that a concurrent write has already invalidated
+        if generation == _dashboard_cache["generation"]:
+            _dashboard_cache["value"] = stats
+            _dashboard_cache["expires"] = time.monotonic() + DASHBOARD_CACHE_TTL
+        return stats
+
+async def compute_dashboard_stats():
+    # Compute every metric server-side in a single aggregation
+    pipeline = [
+        {"$project": {"quantity": 1, "price": 1, "category": 1, "_id": 0}},
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "total_items": {"$sum": 1},
+                    "total_quantity": {"$sum": "$quantity"},
+                    "total_value": {"$sum": {"$multiply": ["$quantity", "$price"]}},
+                }}
+            ],
+            "categories": [
+                {"$group": {"_id": {"$ifNull": ["$category", "General"]}}},
+                {"$count": "categories"},
+            ],
+        }}
+    ]
+    # low_stock is denormalized on write, so it's a count over a partial index
+    try:
+        results, low_stock_items = await asyncio.gather(
+            db.inventory_items.aggregate(pipeline).to_list(1),
+            db.inventory_items.count_documents({"low_stock": True}),
+        )
+    except OperationFailure:
+        # Some Mongo-compatible backends don't support $facet
+        logger.warning("Dashboard aggregation failed, falling back to client-side stats", exc_info=True)
+        return await compute_dashboard_stats_fallback()
+    result = results[0]
+
+    # Empty branches come back as [] when there are no matching documents
+    totals = result["totals"][0] if result["totals"] else {}
+    categories = result["categories"][0] if result["categories"] else {}
+
     return {
-        "total_items": total_items,
-        "total_quantity": total_quantity,
-        "total_value": total_value,
+        "total_items": totals.get("total_items", 0),
+        "total_quantity": totals.get("total_quantity", 0),
+        "total_value": totals.get("total_value", 0),
         "low_stock_items": low_stock_items,
-        "categories": categories
+        "categories": categories.get("categories", 0)
+    }
+
+async def compute_dashboard_stats_fallback():
+    items = await db.inventory_items.find(
+        {}, {"quantity": 1, "price": 1, "min_stock": 1, "category": 1, "_id": 0}
+    ).to_list(None)
+
+    count = len(items)
+    quantity = np.fromiter((item["quantity"] for item in items), dtype=np.int64, count=count)
+    price = np.fromiter((item["price"] for item in items), dtype=np.float64, count=count)
+    # Mirror the pipeline's $ifNull defaults, which also cover explicit nulls
+    min_stock = np.fromiter(
+        (10 if item.get("min_stock") is None else item["min_stock"] for item in items),
+        dtype=np.int64,
+        count=count,
+    )
+
+    return {
+        "total_items": count,
+        "total_quantity": int(quantity.sum()),
+        "total_value": float((quantity * price).sum()),
+        "low_stock_items": int((quantity <= min_stock).sum()),
+        "categories": len(set(item.get("category") or "General" for item in items))
     }
 
+# Password hashing (PBKDF2-HMAC-SHA256 with a per-user random salt)
+PASSWORD_ITERATIONS = 200_000
+
+def hash_password(password: str, salt: Optional[bytes] = None, iterations: int = PASSWORD_ITERATIONS) -> str:
+    if salt is None:
+        salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"pbkdf2_sha256${iterations}${salt.hex()}${digest.hex()}"
+
+def is_legacy_hash(password_hash: str) -> bool:
+    # Users created before salted hashing stored a bare SHA-256 digest
+    return not password_hash.startswith("pbkdf2_sha256$")
+
+def verify_password(password: str, password_hash: str) -> bool:
+    if is_legacy_hash(password_hash):
+        legacy_hash = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(legacy_hash, password_hash)
+    try:
+        _, iterations, salt, _ = password_hash.split("$")
+        expected = hash_password(password, bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        # Corrupt stored hash: treat as a failed login rather than a server error
+        return False
+    return hmac.compare_digest(expected, password_hash)
+
+# Verified against for unknown usernames, so they cost as much as a real check
+DUMMY_PASSWORD_HASH = hash_password("")
+
 # User routes (basic implementation)
 @api_router.post("/users", response_model=User)
 async def create_user(user: UserCreate):
-    # In a real app, hash the password properly
-    import hashlib
-    password_hash = hashlib.sha256(user.password.encode()).hexdigest()
+    # PBKDF2 is deliberately slow; keep it off the event loop
+    password_hash = await asyncio.get_running_loop().run_in_executor(None, hash_password, user.password)
     
     user_dict = user.dict()
     user_dict["password_hash"] = password_hash
     del user_dict["password"]
     
     user_obj = User(**user_dict)
-    await db.users.insert_one(user_obj.dict())
+    try:
+        await db.users.insert_one(user_obj.dict())
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Username already exists")
     return user_obj
 
 @api_router.post("/auth/login")
 async def login(username: str, password: str):
-    import hashlib
-    password_hash = hashlib.sha256(password.encode()).hexdigest()
-    
-    user = await db.users.find_one({"username": username, "password_hash": password_hash})
-    if user:
-        return {"message": "Login successful", "user": {"id": user["id"], "username": user["username"]}}
-    return {"error": "Invalid credentials"}
+    user = await db.users.find_one(
+        {"username": username},
+        {"id": 1, "username": 1, "password_hash": 1, "_id": 0},
+    )
+    loop = asyncio.get_running_loop()
+    password_hash = user["password_hash"] if user else DUMMY_PASSWORD_HASH
+    if not await loop.run_in_executor(None, verify_password, password, password_hash) or not user:
+        return {"error": "Invalid credentials"}
+
+    if is_legacy_hash(password_hash):
+        # Upgrade unsalted SHA-256 hashes now that we have the plaintext
+        new_hash = await loop.run_in_executor(None, hash_password, password)
+        await db.users.update_one(
+            {"id": user["id"], "password_hash": password_hash},
+            {"$set": {"password_hash": new_hash}},
+        )
+    return {"message": "Login successful", "user": {"id": user["id"], "username": user["username"]}}
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -223,6 +659,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+async def create_unique_index(collection, field: str):
+    # Data written before uniqueness was enforced may contain duplicates; don't block startup on it.
+    # Any other index failure (e.g. a conflicting existing index) is a real misconfiguration.
+    try:
+        await collection.create_index(field, unique=True)
+    except DuplicateKeyError:
+        duplicates = await collection.aggregate([
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$match": {"count": {"$gt": 1}}},
+            {"$limit": 20},
+        ]).to_list(20)
+        logger.error(
+            "Could not create unique index on %s.%s; duplicate values must be resolved first: %s",
+            collection.name, field, [dup["_id"] for dup in duplicates],
+        )
+
+@app.on_event("startup")
+async def create_indexes():
+    await create_unique_index(db.inventory_items, "id")
+    await create_unique_index(db.inventory_items, "code")
+    await db.inventory_items.create_index([("category", 1), ("quantity", 1)])
+    await db.inventory_items.create_index([("created_at", -1), ("id", 1)])
+    await db.inventory_items.create_index("low_stock", partialFilterExpression={"low_stock": True})
+    await db.stock_movements.create_index([("item_id", 1), ("timestamp", -1)])
+    await db.stock_movements.create_index([("timestamp", -1), ("id", 1)])
+    await create_unique_index(db.users, "username")
+
+@app.on_event("startup")
+async def backfill_low_stock():
+    # One-off migration: items created before low_stock was denormalized lack the flag.
+    # The marker document keeps later boots from rescanning the whole collection.
+    migration_id = "backfill_low_stock"
+    if await db.migrations.find_one({"_id": migration_id}):
+        return
+    result = await db.inventory_items.update_many({"low_stock": {"$exists": False}}, [LOW_STOCK_STAGE])
+    # Upsert so several workers booting together don't trip over the marker's _id
+    await db.migrations.update_one(
+        {"_id": migration_id}, {"$setOnInsert": {"applied_at": utcnow()}}, upsert=True
+    )
+    logger.info("Backfilled low_stock on %d inventory items", result.modified_count)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
\ No newline at end of file
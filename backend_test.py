@@ -158,9 +158,9 @@ class InventoryAPITest(unittest.TestCase):
         
         # Verify item is deleted
         response = requests.get(f"{BASE_URL}/items/{item_id}")
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 404)
         data = response.json()
-        self.assertIn("error", data)
+        self.assertIn("detail", data)
         
         print("✅ Delete Item: Passed")
 
@@ -404,17 +404,13 @@ class InventoryAPITest(unittest.TestCase):
         duplicate_item["name"] = f"{self.test_prefix}_Duplicate"
         
         response = requests.post(f"{BASE_URL}/items", json=duplicate_item)
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 400)
         
-        # The API doesn't currently prevent duplicates, so we're just checking it doesn't error
-        # In a real-world scenario, we might expect a 400 error for duplicates
+        # Item codes are backed by a unique index, so duplicates are rejected
         data = response.json()
-        self.assertIn("id", data)
+        self.assertIn("detail", data)
         
-        # Clean up the duplicate
-        self.created_items.append(data["id"])
-        
-        print("✅ Duplicate Item Code Handling: Passed (Note: API allows duplicates)")
+        print("✅ Duplicate Item Code Handling: Passed")
 
     def test_17_invalid_item_id(self):
         """Test handling of invalid item IDs"""
@@ -422,25 +418,191 @@ class InventoryAPITest(unittest.TestCase):
         
         # Try to get a non-existent item
         response = requests.get(f"{BASE_URL}/items/{invalid_id}")
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 404)
         data = response.json()
-        self.assertIn("error", data)
+        self.assertIn("detail", data)
         
         # Try to update a non-existent item
         update_data = {"name": "This should fail"}
         response = requests.put(f"{BASE_URL}/items/{invalid_id}", json=update_data)
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 404)
         data = response.json()
-        self.assertIn("error", data)
+        self.assertIn("detail", data)
         
         # Try to delete a non-existent item
         response = requests.delete(f"{BASE_URL}/items/{invalid_id}")
-        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.status_code, 404)
         data = response.json()
-        self.assertIn("error", data)
+        self.assertIn("detail", data)
         
         print("✅ Invalid Item ID Handling: Passed")
 
+    def test_17b_movement_for_missing_item(self):
+        """Test that movements for unknown items are rejected and not recorded"""
+        missing_id = str(uuid.uuid4())
+        movement_data = {
+            "item_id": missing_id,
+            "item_name": "Missing",
+            "movement_type": "entrada",
+            "quantity": 5,
+            "reason": "Should fail",
+            "user": "Test User"
+        }
+        
+        response = requests.post(f"{BASE_URL}/movements", json=movement_data)
+        self.assertEqual(response.status_code, 404)
+        
+        response = requests.post(f"{BASE_URL}/movements/bulk", json=[movement_data])
+        self.assertEqual(response.status_code, 404)
+        
+        # No orphan movement may have been recorded
+        response = requests.get(f"{BASE_URL}/movements", params={"limit": 1000})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(missing_id, [movement["item_id"] for movement in response.json()])
+        
+        print("✅ Movement for Missing Item: Passed")
+
+    def test_18_bulk_items_and_movements(self):
+        """Test bulk item creation and bulk stock movements"""
+        bulk_items = [
+            {
+                "name": f"{self.test_prefix}_Bulk{i}",
+                "code": f"BLK{i}-{self.test_prefix}",
+                "quantity": 10,
+                "price": 5.00,
+                "location": "Warehouse C",
+                "category": "Bulk",
+                "min_stock": 2
+            }
+            for i in range(3)
+        ]
+        
+        response = requests.post(f"{BASE_URL}/items/bulk", json=bulk_items)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data["inserted"]), len(bulk_items))
+        self.assertEqual(data["rejected"], [])
+        item_ids = [item["id"] for item in data["inserted"]]
+        self.created_items.extend(item_ids)
+        
+        # Two movements on the same item must be applied in order
+        movements = [
+            {
+                "item_id": item_ids[0],
+                "item_name": bulk_items[0]["name"],
+                "movement_type": "entrada",
+                "quantity": 5,
+                "reason": "Bulk restock",
+                "user": "Test User"
+            },
+            {
+                "item_id": item_ids[0],
+                "item_name": bulk_items[0]["name"],
+                "movement_type": "saida",
+                "quantity": 3,
+                "reason": "Bulk sale",
+                "user": "Test User"
+            }
+        ]
+        
+        response = requests.post(f"{BASE_URL}/movements/bulk", json=movements)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), len(movements))
+        
+        response = requests.get(f"{BASE_URL}/items/{item_ids[0]}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["quantity"], 12)
+        
+        print("✅ Bulk Items and Movements: Passed")
+
+    def test_18b_bulk_items_duplicate_code(self):
+        """Test that bulk creation reports duplicate codes and keeps the rest"""
+        bulk_items = [
+            {
+                "name": f"{self.test_prefix}_BulkDup{i}",
+                "code": code,
+                "quantity": 10,
+                "price": 5.00,
+                "location": "Warehouse C",
+                "category": "Bulk",
+                "min_stock": 2
+            }
+            for i, code in enumerate([
+                f"DUP-{self.test_prefix}",
+                f"DUP-{self.test_prefix}",
+                f"UNQ-{self.test_prefix}"
+            ])
+        ]
+        
+        response = requests.post(f"{BASE_URL}/items/bulk", json=bulk_items)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.created_items.extend(item["id"] for item in data["inserted"])
+        
+        # The second entry collides with the first; the other two are stored
+        self.assertEqual(len(data["inserted"]), 2)
+        self.assertEqual(len(data["rejected"]), 1)
+        self.assertEqual(data["rejected"][0]["index"], 1)
+        self.assertEqual(data["rejected"][0]["code"], f"DUP-{self.test_prefix}")
+        
+        print("✅ Bulk Items Duplicate Code: Passed")
+
+    def test_19_item_etag(self):
+        """Test conditional GET on a specific item using its ETag"""
+        # First create an item if none exists
+        if not hasattr(self, 'test_item_id'):
+            self.test_02_create_item()
+            
+        response = requests.get(f"{BASE_URL}/items/{self.test_item_id}")
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers.get("ETag")
+        self.assertIsNotNone(etag)
+        
+        # Unchanged item should come back as 304 with no body
+        response = requests.get(f"{BASE_URL}/items/{self.test_item_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        
+        # Weak comparison: the same tag without the W/ prefix still matches
+        strong_etag = etag[2:] if etag.startswith("W/") else etag
+        response = requests.get(f"{BASE_URL}/items/{self.test_item_id}", headers={"If-None-Match": strong_etag})
+        self.assertEqual(response.status_code, 304)
+        
+        # Updating the item must invalidate the ETag
+        requests.put(f"{BASE_URL}/items/{self.test_item_id}", json={"location": "Warehouse Z"})
+        response = requests.get(f"{BASE_URL}/items/{self.test_item_id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers.get("ETag"), etag)
+        
+        print("✅ Item ETag: Passed")
+
+    def test_20_items_pagination(self):
+        """Test that limit/offset return disjoint pages of items"""
+        # Make sure there are at least two pages of one item each
+        for i in range(2):
+            page_item = self.test_item.copy()
+            page_item["name"] = f"{self.test_prefix}_Page{i}"
+            page_item["code"] = f"PG{i}-{self.test_prefix}"
+            response = requests.post(f"{BASE_URL}/items", json=page_item)
+            self.assertEqual(response.status_code, 200)
+            self.created_items.append(response.json()["id"])
+        
+        response = requests.get(f"{BASE_URL}/items", params={"limit": 1, "offset": 0})
+        self.assertEqual(response.status_code, 200)
+        first_page = response.json()
+        
+        response = requests.get(f"{BASE_URL}/items", params={"limit": 1, "offset": 1})
+        self.assertEqual(response.status_code, 200)
+        second_page = response.json()
+        
+        self.assertEqual(len(first_page), 1)
+        self.assertEqual(len(second_page), 1)
+        self.assertNotEqual(first_page[0]["id"], second_page[0]["id"])
+        
+        # Newest items come first, so the last one created leads the first page
+        self.assertEqual(first_page[0]["id"], self.created_items[-1])
+        
+        print("✅ Items Pagination: Passed")
+
 if __name__ == "__main__":
     # Create a test suite
     test_suite = unittest.TestSuite()
@@ -463,6 +625,11 @@ if __name__ == "__main__":
     test_suite.addTest(InventoryAPITest('test_15_negative_quantity_prevention'))
     test_suite.addTest(InventoryAPITest('test_16_duplicate_item_code'))
     test_suite.addTest(InventoryAPITest('test_17_invalid_item_id'))
+    test_suite.addTest(InventoryAPITest('test_17b_movement_for_missing_item'))
+    test_suite.addTest(InventoryAPITest('test_18_bulk_items_and_movements'))
+    test_suite.addTest(InventoryAPITest('test_18b_bulk_items_duplicate_code'))
+    test_suite.addTest(InventoryAPITest('test_19_item_etag'))
+    test_suite.addTest(InventoryAPITest('test_20_items_pagination'))
     
     # Run the tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,78 @@
+import asyncio
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length):
+        return list(self.docs)
+
+
+class FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def find(self, query, projection):
+        return FakeCursor(self.docs)
+
+
+class FakeDatabase:
+    def __init__(self, docs):
+        self.inventory_items = FakeCollection(docs)
+
+
+class DashboardFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.original_db = server.db
+
+    def tearDown(self):
+        server.db = self.original_db
+
+    def compute(self, docs):
+        server.db = FakeDatabase(docs)
+        return asyncio.run(server.compute_dashboard_stats_fallback())
+
+    def test_totals(self):
+        stats = self.compute([
+            {"quantity": 5, "price": 2.5, "min_stock": 10, "category": "A"},
+            {"quantity": 20, "price": 1.0, "min_stock": 10, "category": "B"},
+        ])
+        self.assertEqual(stats, {
+            "total_items": 2,
+            "total_quantity": 25,
+            "total_value": 32.5,
+            "low_stock_items": 1,
+            "categories": 2,
+        })
+
+    def test_missing_and_null_fields_use_pipeline_defaults(self):
+        # The $facet pipeline maps missing/null category to "General" and min_stock to 10
+        stats = self.compute([
+            {"quantity": 1, "price": 1.0, "category": "General"},
+            {"quantity": 1, "price": 1.0, "category": None, "min_stock": None},
+            {"quantity": 50, "price": 1.0},
+        ])
+        self.assertEqual(stats["categories"], 1)
+        self.assertEqual(stats["low_stock_items"], 2)
+
+    def test_empty_collection(self):
+        stats = self.compute([])
+        self.assertEqual(stats, {
+            "total_items": 0,
+            "total_quantity": 0,
+            "total_value": 0.0,
+            "low_stock_items": 0,
+            "categories": 0,
+        })
+
+
+if __name__ == "__main__":
+    unittest.main()
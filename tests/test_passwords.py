@@ -0,0 +1,32 @@
+import hashlib
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import server  # noqa: E402
+
+
+class PasswordHashingTest(unittest.TestCase):
+    def test_round_trip(self):
+        password_hash = server.hash_password("secret")
+        self.assertTrue(server.verify_password("secret", password_hash))
+        self.assertFalse(server.verify_password("wrong", password_hash))
+
+    def test_salted(self):
+        self.assertNotEqual(server.hash_password("secret"), server.hash_password("secret"))
+
+    def test_legacy_sha256_hash(self):
+        legacy_hash = hashlib.sha256(b"secret").hexdigest()
+        self.assertTrue(server.is_legacy_hash(legacy_hash))
+        self.assertTrue(server.verify_password("secret", legacy_hash))
+        self.assertFalse(server.verify_password("wrong", legacy_hash))
+
+    def test_malformed_hash_fails_instead_of_raising(self):
+        self.assertFalse(server.verify_password("x", "pbkdf2_sha256$bad"))
+        self.assertFalse(server.verify_password("x", "pbkdf2_sha256$many$not$hex$parts"))
+
+
+if __name__ == "__main__":
+    unittest.main()